@@ -1,12 +1,15 @@
 # app.py
 from flask import Flask, jsonify
 from flask_cors import CORS
+from pymongo.errors import ConnectionFailure
+from app.common.dbConnect import DB_NAME, ensure_indexes, get_db
+from app.common.flask_json import OrjsonProvider
 from dotenv import load_dotenv
 import os
 import logging
 
 # Import the mobile routes blueprint
-from routes.mobile_routes import mobile_bp
+from app.utils.mobile_routes import mobile_bp
 
 # Load environment variables
 load_dotenv()
@@ -20,6 +23,18 @@ logger = logging.getLogger(__name__)
 
 def create_app():
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    
+    # dbConnect falls back to the 'test' database; the Flask API used to default to sriLanka
+    if not os.getenv('DB_NAME'):
+        logger.warning("⚠️ DB_NAME is not set, reading offers from the '%s' database", DB_NAME)
+    
+    # Best effort: a MongoDB outage during a deploy must not stop workers
+    # from booting; /health then reports the database as disconnected
+    try:
+        ensure_indexes(get_db())
+    except ConnectionFailure as e:
+        logger.warning("⚠️ Skipping index creation, MongoDB is unreachable: %s", e)
     
     # Enable CORS for all routes
     CORS(app, 
@@ -63,7 +78,8 @@ def create_app():
                             'page': 'int (default: 1)',
                             'limit': 'int (default: 20, max: 100)',
                             'category': 'string (optional)',
-                            'search': 'string (optional)'
+                            'search': 'string (optional)',
+                            'fields': 'comma-separated offer fields (optional)'
                         }
                     },
                     {
@@ -101,7 +117,7 @@ def create_app():
     
     @app.errorhandler(500)
     def internal_error(error):
-        logger.error(f"Internal server error: {error}")
+        logger.error("Internal server error: %s", error)
         return jsonify({
             'success': False,
             'message': 'Internal server error',
@@ -144,11 +160,11 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     host = os.environ.get('HOST', '0.0.0.0')
     
-    logger.info(f"Starting Sri Lanka Tours Mobile API on {host}:{port}")
+    logger.info("Starting Sri Lanka Tours Mobile API on %s:%s", host, port)
     
-    # Run the app
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
     app.run(
         host=host,
         port=port,
-        debug=True  # Set to False in production
+        debug=os.environ.get('FLASK_ENV') == 'development'
     )
\ No newline at end of file
@@ -0,0 +1,70 @@
+# app/common/cache.py
+import functools
+import threading
+from cachetools import TTLCache
+
+# In-process TTL caches for read-mostly API responses
+offers_cache = TTLCache(maxsize=256, ttl=60)
+categories_cache = TTLCache(maxsize=1, ttl=300)
+offer_details_cache = TTLCache(maxsize=512, ttl=120)
+
+# Encoded FastAPI offer list pages; a short TTL absorbs bursts of identical browses
+api_offers_cache = TTLCache(maxsize=512, ttl=15)
+
+# Collection counts reported by the health checks
+health_cache = TTLCache(maxsize=4, ttl=30)
+
+# Scraped reference pages change rarely. Every worker process keeps its own
+# caches and cache invalidation or a page refresh only clears the worker that
+# handles it, so the other workers pick up changes when these 5-minute TTLs expire.
+scrape_cache = TTLCache(maxsize=64, ttl=300)
+
+# Encoded /api/mobile/scraped responses, keyed by page name ("__all__" for the list)
+scraped_pages_cache = TTLCache(maxsize=64, ttl=300)
+
+# TTLCache is not thread-safe and Flask serves requests from several threads
+_lock = threading.Lock()
+
+def cache_get(cache, key):
+    """Return the cached value for key, or None on a miss"""
+    with _lock:
+        return cache.get(key)
+
+def cache_set(cache, key, value):
+    """Store value under key until the cache's TTL expires"""
+    with _lock:
+        cache[key] = value
+
+def cached_scrape(func):
+    """Cache a scraper coroutine's successful results in scrape_cache.
+
+    Results are keyed by the scraper name and its arguments, so e.g.
+    get_visa_data("General Information") is cached per title.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        cached = cache_get(scrape_cache, key)
+        if cached is not None:
+            return cached
+        result = await func(*args, **kwargs)
+        if result and "error" not in result:
+            cache_set(scrape_cache, key, result)
+        return result
+    return wrapper
+
+def clear_scrape_cache():
+    """Drop all cached scraper results and scraped page responses"""
+    with _lock:
+        scrape_cache.clear()
+        scraped_pages_cache.clear()
+
+def clear_scraped_pages_cache():
+    """Drop the cached scraped page responses, e.g. after a page is re-scraped"""
+    with _lock:
+        scraped_pages_cache.clear()
+
+def clear_api_offers_cache():
+    """Drop the FastAPI offer pages cached by this process"""
+    with _lock:
+        api_offers_cache.clear()
@@ -1,5 +1,11 @@
 # app/common/dbConnect.py
-from pymongo import MongoClient
+import asyncio
+import threading
+from functools import lru_cache
+import pymongo
+from pymongo import MongoClient, ASCENDING, DESCENDING, TEXT
+from pymongo.errors import ConnectionFailure, OperationFailure
+from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from dotenv import load_dotenv
 
@@ -13,19 +19,133 @@ DB_NAME = os.getenv('DB_NAME', 'test')  # Default database name
 if not MONGO_URI:
     raise ValueError("MONGO_URI environment variable is required")
 
-try:
-    client = MongoClient(MONGO_URI)
-    db = client[DB_NAME]
-    
-    # Test the connection
-    client.admin.command('ping')
-    print(f"✅ Connected to MongoDB database: {DB_NAME}")
-    
-except Exception as e:
-    print(f"❌ Failed to connect to MongoDB: {e}")
-    raise e
-
-# Export collections
-offers_collection = db.offers
-businesses_collection = db.businesses
-users_collection = db.users
\ No newline at end of file
+# Each app builds only the client it uses (Flask the synchronous one,
+# FastAPI and the scrapers the Motor one), on first use. zlib is the
+# fallback compressor when zstandard isn't installed.
+CLIENT_OPTIONS = {
+    'maxPoolSize': 50,
+    'minPoolSize': 10,
+    'maxIdleTimeMS': 60000,
+    'serverSelectionTimeoutMS': 3000,
+    'socketTimeoutMS': 5000,
+    'retryWrites': True,
+    'compressors': 'zstd,zlib'
+}
+
+# Index builds and other startup maintenance can take much longer than
+# socketTimeoutMS on large collections, so they run under pymongo.timeout()
+# with this deadline (in seconds) instead. Inside pymongo.timeout() server
+# selection also waits out the deadline, so callers ping the server with the
+# client's own timeouts first.
+ADMIN_TIMEOUT = 600
+
+@lru_cache(maxsize=1)
+def get_db():
+    """Return the synchronous database handle, created on first call.
+
+    The client connects in the background, so an unreachable server surfaces
+    as errors from the first queries (and /health) rather than from here.
+    """
+    return MongoClient(MONGO_URI, **CLIENT_OPTIONS)[DB_NAME]
+
+@lru_cache(maxsize=1)
+def get_async_db():
+    """Return the Motor database handle for code running on an event loop (FastAPI handlers, scrapers)"""
+    return AsyncIOMotorClient(MONGO_URI, **CLIENT_OPTIONS)[DB_NAME]
+
+# MongoDB allows a single text index per collection, so it covers every
+# field searched by either API. ?search= queries fail without it.
+OFFERS_TEXT_INDEX = ('offers', [('title', TEXT), ('description', TEXT), ('discount', TEXT), ('category', TEXT)], {'name': 'offers_text'})
+
+# Indexes backing the mobile offers queries, as (collection, keys, options)
+INDEXES = [
+    ('offers', [('adminStatus', ASCENDING), ('isActive', ASCENDING), ('createdAt', DESCENDING)], {}),
+    # Equality (status, category) then sort (createdAt) for category-filtered pages
+    ('offers', [('adminStatus', ASCENDING), ('isActive', ASCENDING), ('category', ASCENDING), ('createdAt', DESCENDING)], {}),
+    OFFERS_TEXT_INDEX,
+    # Lookup index only: users is written by the account service and userId
+    # is loosely typed there (number or string), so no uniqueness constraint
+    ('users', [('userId', ASCENDING)], {}),
+    ('scrape', [('page', ASCENDING), ('section_title', ASCENDING)], {'unique': True}),
+    ('scrape_summary', [('page', ASCENDING), ('title', ASCENDING)], {'unique': True}),
+]
+
+def ensure_indexes(db, indexes=INDEXES):
+    """Create the indexes used by the API (no-op when they already exist).
+
+    Raises ConnectionFailure when the server cannot be reached, so callers
+    give up after one serverSelectionTimeoutMS instead of one per index.
+    """
+    db.client.admin.command('ping')
+    for name, keys, options in indexes:
+        try:
+            with pymongo.timeout(ADMIN_TIMEOUT):
+                db[name].create_index(keys, **options)
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            print(f"⚠️ Could not create index {keys} on {name}: {e}")
+
+async def ensure_async_indexes(db, indexes=INDEXES):
+    """ensure_indexes() for a Motor database handle, creating the indexes concurrently"""
+    try:
+        await db.client.admin.command('ping')
+    except ConnectionFailure as e:
+        print(f"⚠️ Skipping index creation, MongoDB is unreachable: {e}")
+        return
+    with pymongo.timeout(ADMIN_TIMEOUT):
+        results = await asyncio.gather(
+            *(db[name].create_index(keys, **options) for name, keys, options in indexes),
+            return_exceptions=True
+        )
+    for (name, keys, _), result in zip(indexes, results):
+        if isinstance(result, Exception):
+            print(f"⚠️ Could not create index {keys} on {name}: {result}")
+
+def is_missing_text_index(error):
+    """True when a $text query failed because the collection has no text index"""
+    # 27 is MongoDB's IndexNotFound error code
+    return isinstance(error, OperationFailure) and error.code == 27
+
+_text_index_lock = threading.Lock()
+
+def retry_text_index(db):
+    """Build OFFERS_TEXT_INDEX in a background thread, e.g. after startup could not.
+
+    At most one attempt runs at a time; failures such as an option conflict
+    with an existing text index are only printed.
+    """
+    if not _text_index_lock.acquire(blocking=False):
+        return
+
+    def build():
+        try:
+            ensure_indexes(db, [OFFERS_TEXT_INDEX])
+        except ConnectionFailure as e:
+            print(f"⚠️ Could not create the offers text index: {e}")
+        finally:
+            _text_index_lock.release()
+
+    threading.Thread(target=build, daemon=True).start()
+
+_text_index_task = None
+
+def retry_async_text_index(db):
+    """retry_text_index() for a Motor database handle, run as a task on the current event loop"""
+    global _text_index_task
+    if _text_index_task is None or _text_index_task.done():
+        _text_index_task = asyncio.create_task(ensure_async_indexes(db, [OFFERS_TEXT_INDEX]))
+
+def close_async_db():
+    """Close the Motor client so the next get_async_db() call builds one on the running event loop.
+
+    Motor clients are bound to the event loop they were created on, so this
+    runs when the FastAPI app shuts down.
+    """
+    global _text_index_task
+    if _text_index_task is not None:
+        _text_index_task.cancel()
+        _text_index_task = None
+    if get_async_db.cache_info().currsize:
+        get_async_db().client.close()
+    get_async_db.cache_clear()
@@ -0,0 +1,15 @@
+# app/common/flask_json.py
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+from app.common.json_encoding import orjson_default
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=orjson_default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
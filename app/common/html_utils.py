@@ -1,8 +1,50 @@
-def extract_headings(soup):
-    headings = []
-    for i in range(1, 7):
-        headings.extend(tag.get_text(strip=True) for tag in soup.find_all(f'h{i}'))
-    return headings
-
-def extract_list_items(soup):
-    return [li.get_text(strip=True) for li in soup.find_all('li')]
\ No newline at end of file
+from functools import lru_cache
+from html import escape
+
+from lxml import etree
+
+# XPath expressions are compiled once at import instead of on every call
+_HEADINGS_AND_ITEMS_XP = etree.XPath('.//h1 | .//h2 | .//h3 | .//h4 | .//h5 | .//h6 | .//li')
+_HEADING_TAGS = frozenset(('h1', 'h2', 'h3', 'h4', 'h5', 'h6'))
+
+
+def get_text(element):
+    """Text of an element with each string stripped, like BeautifulSoup's get_text(strip=True)"""
+    return "".join(text.strip() for text in element.itertext())
+
+@lru_cache(maxsize=None)
+def _class_xpath(tag, class_name):
+    conditions = " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+        for cls in class_name.split()
+    )
+    return etree.XPath(f".//{tag}[{conditions}]")
+
+def find_all_by_class(root, tag, class_name):
+    """All descendant <tag> elements carrying every class in class_name"""
+    return _class_xpath(tag, class_name)(root)
+
+def find_by_class(root, tag, class_name):
+    """First descendant <tag> carrying every class in class_name, or None"""
+    matches = find_all_by_class(root, tag, class_name)
+    return matches[0] if matches else None
+
+def inner_html(element):
+    """HTML of an element's children, like BeautifulSoup's decode_contents()"""
+    return escape(element.text or "", quote=False) + "".join(
+        etree.tostring(child, method="html", encoding="unicode") for child in element
+    )
+
+def outer_html(element):
+    """HTML of an element itself, without its trailing text"""
+    return etree.tostring(element, method="html", encoding="unicode", with_tail=False)
+
+def extract_headings_and_lists(root):
+    """Heading texts and list item texts under root, each in document order.
+
+    Both come from a single XPath evaluation instead of two tree walks.
+    """
+    headings, list_items = [], []
+    for element in _HEADINGS_AND_ITEMS_XP(root):
+        (headings if element.tag in _HEADING_TAGS else list_items).append(get_text(element))
+    return headings, list_items
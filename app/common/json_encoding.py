@@ -0,0 +1,14 @@
+# app/common/json_encoding.py
+import orjson
+from bson import ObjectId
+
+
+def orjson_default(obj):
+    """Encode the BSON types orjson does not handle natively"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj):
+    """Serialize obj to JSON bytes with orjson"""
+    return orjson.dumps(obj, default=orjson_default)
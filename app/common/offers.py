@@ -0,0 +1,89 @@
+# app/common/offers.py
+from datetime import datetime, timezone
+
+
+def utc_now():
+    """Current UTC time as a naive datetime, like the dates pymongo returns"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def is_offer_active(offer, now):
+    """Check if offer is currently active at `now` based on dates and status"""
+    # Must be admin approved
+    if offer.get('adminStatus') != 'approved':
+        return False
+    
+    # Must be marked as active
+    if not offer.get('isActive', True):
+        return False
+    
+    # Check start date
+    start_date = offer.get('startDate')
+    if start_date and isinstance(start_date, datetime) and start_date > now:
+        return False
+    
+    # Check end date
+    end_date = offer.get('endDate')
+    if end_date and isinstance(end_date, datetime) and end_date < now:
+        return False
+    
+    return True
+
+def active_window_filter(now=None):
+    """Query clauses keeping offers whose start/end dates bracket `now` (default: utc_now()).
+
+    Like is_offer_active(), a missing or non-date startDate/endDate is ignored.
+    """
+    if now is None:
+        now = utc_now()
+    return [
+        {'$or': [{'startDate': {'$not': {'$type': 'date'}}}, {'startDate': {'$lte': now}}]},
+        {'$or': [{'endDate': {'$not': {'$type': 'date'}}}, {'endDate': {'$gte': now}}]}
+    ]
+
+def offer_page_pipeline(query, sort, skip, limit, page_stages=(), text_score=False):
+    """Aggregation returning one page of offers and the total match count.
+
+    $sort stays ahead of $facet: facet sub-pipelines cannot use indexes,
+    while a $sort straight after $match walks the createdAt index.
+    page_stages shape each offer on the page; text_score adds the $text
+    relevance as a `score` field for sort to use.
+    """
+    pipeline = [{'$match': query}]
+    if text_score:
+        pipeline.append({'$addFields': {'score': {'$meta': 'textScore'}}})
+    pipeline += [
+        {'$sort': sort},
+        {'$facet': {
+            'data': [{'$skip': skip}, {'$limit': limit}, *page_stages],
+            'total': [{'$count': 'n'}]
+        }}
+    ]
+    return pipeline
+
+def unpack_offer_page(result):
+    """Split an offer_page_pipeline() result into (offers, total count)"""
+    return result['data'], (result['total'][0]['n'] if result['total'] else 0)
+
+# Status and expiry fields for the FastAPI list endpoint, computed by Mongo.
+# The list query only matches currently active offers, so isCurrentlyActive
+# is constant. Expiry fields are only set when endDate is a date, and
+# daysUntilExpiry is converted back to an integer (like timedelta.days)
+# because $floor of a $divide is a double.
+_HAS_END_DATE = {'$eq': [{'$type': '$endDate'}, 'date']}
+OFFER_STATUS_STAGES = [
+    {'$addFields': {
+        'isCurrentlyActive': {'$literal': True},
+        'daysUntilExpiry': {'$cond': [
+            _HAS_END_DATE,
+            {'$toLong': {'$floor': {'$divide': [{'$subtract': ['$endDate', '$$NOW']}, 86400000]}}},
+            '$$REMOVE'
+        ]}
+    }},
+    {'$addFields': {
+        'isExpiringSoon': {'$cond': [
+            _HAS_END_DATE,
+            {'$and': [{'$lte': ['$daysUntilExpiry', 7]}, {'$gt': ['$daysUntilExpiry', 0]}]},
+            '$$REMOVE'
+        ]}
+    }}
+]
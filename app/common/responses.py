@@ -0,0 +1,46 @@
+# app/common/responses.py
+import asyncio
+import functools
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+
+from app.common.json_encoding import orjson_default
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson, encoding ObjectId and datetime values directly.
+
+    Returning it from a handler skips FastAPI's jsonable_encoder pass;
+    fast_response_serialization() does the same for plain return values.
+    """
+
+    def render(self, content):
+        # OPT_NON_STR_KEYS keeps parity with json.dumps for int-keyed dicts
+        return orjson.dumps(content, default=orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _render_directly(call):
+    @functools.wraps(call)
+    async def endpoint(**values):
+        content = await call(**values)
+        if isinstance(content, Response):
+            return content
+        return ORJSONResponse(content)
+    return endpoint
+
+def fast_response_serialization(app):
+    """Render plain return values of async routes with ORJSONResponse.
+
+    FastAPI otherwise runs jsonable_encoder over every returned dict before
+    encoding it. Routes with a response_model keep FastAPI's validation path.
+    Call this after all routes are declared.
+    """
+    for route in app.routes:
+        if (
+            isinstance(route, APIRoute)
+            and route.response_model is None
+            and asyncio.iscoroutinefunction(route.dependant.call)
+        ):
+            route.dependant.call = _render_directly(route.dependant.call)
@@ -1,21 +1,96 @@
-import requests
-from bs4 import BeautifulSoup
-
-def scrape_webpage(url):
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
+import asyncio
+from io import BytesIO
+
+import aiohttp
+from lxml import etree, html
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    )
+}
+
+# Process-wide session so repeated scrapes reuse pooled TCP/TLS connections
+_http_session = None
+
+def get_http_session():
+    """Return the shared aiohttp session, creating it on first use"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=10)
         )
-    }
+    return _http_session
+
+async def close_http_session():
+    """Close the shared aiohttp session (called on application shutdown)"""
+    global _http_session
+    if _http_session is not None:
+        await _http_session.close()
+        _http_session = None
+
+def parse_html(content, encoding=None):
+    """Parse an HTML document into an lxml tree, or None if it is empty.
+
+    Passing the charset declared by the server skips lxml's own encoding
+    detection on the raw bytes. An unknown charset falls back to detection.
+    """
+    try:
+        parser = html.HTMLParser(encoding=encoding) if encoding else None
+        return html.document_fromstring(content, parser=parser)
+    except LookupError:
+        if not encoding:
+            raise
+        print(f"Unknown charset {encoding!r}, detecting encoding instead")
+        return parse_html(content)
+    except etree.ParserError as e:
+        print(f"Failed to parse page: {e}")
+        return None
+
+def parse_section(content, tag, class_name, encoding=None):
+    """Parse only as far as the first <tag> carrying class_name and return it.
+
+    Like BeautifulSoup's find(), the first match in document order wins, so
+    an outer match is returned rather than one nested inside it. Parsing
+    stops as soon as that element is complete, so the rest of the page is
+    never built. Returns a plain lxml element, or None if the section is
+    missing.
+    """
+    classes = set(class_name.split())
+    match = None
+    try:
+        for event, element in etree.iterparse(
+            BytesIO(content), events=("start", "end"), tag=tag, html=True, encoding=encoding
+        ):
+            if event == "start":
+                if match is None and classes.issubset(element.get("class", "").split()):
+                    match = element
+            elif element is match:
+                return element
+    except LookupError:
+        if not encoding:
+            raise
+        print(f"Unknown charset {encoding!r}, detecting encoding instead")
+        return parse_section(content, tag, class_name)
+    except etree.XMLSyntaxError as e:
+        print(f"Failed to parse page: {e}")
+    return None
+
+async def fetch_webpage(url, session=None, only=None):
+    """Fetch and parse url; with only=(tag, class_name) return just that section"""
     try:
-        response = requests.get(url, headers=headers)
-        print(f"Fetching URL: {url}")
-        print(f"Response status code: {response.status_code}")
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        return soup
-    except requests.RequestException as e:
+        async with (session or get_http_session()).get(url, headers=HEADERS) as response:
+            print(f"Fetching URL: {url}")
+            print(f"Response status code: {response.status}")
+            response.raise_for_status()
+            content = await response.read()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         print(f"Request failed: {e}")
         return None
+    # response.charset is None unless the server declared one
+    if only:
+        return parse_section(content, *only, encoding=response.charset)
+    return parse_html(content, response.charset)
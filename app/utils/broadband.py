@@ -1,7 +1,14 @@
-from app.common.dbConnect import db
-from app.common.scrapper import scrape_webpage
-from app.common.html_utils import extract_headings, extract_list_items
-from app.utils.db_save import save_scrape
+import asyncio
+
+from lxml import etree
+
+from app.common.scrapper import fetch_webpage
+from app.common.html_utils import (
+    extract_headings_and_lists, find_by_class, inner_html, outer_html
+)
+from app.utils.db_save import delete_scrape, save_scrape
+
+SECTION_TAGS_XP = etree.XPath(".//h1|.//h2|.//h3|.//table|.//td|.//tr|.//p|.//img")
 
 async def broadband_data(force_scrape=True):
     pages = [
@@ -9,55 +16,62 @@ async def broadband_data(force_scrape=True):
             "url": "https://www.dialog.lk/mobile-broadband/prepaid/plan",
             "page_key": "broadband_dialog",
             "title": "Dialog Prepaid Broadband Plans",
-            "selector": {"class_": "prepaid-postpaid-container addon-hbb-mbb"}
+            "selector": "prepaid-postpaid-container addon-hbb-mbb"
         },
         {
             "url": "https://mobitel.lk/voice-and-data-plans#Anytime%20Data%20+%20Voice%20Plans",
             "page_key": "broadband_mobitel",
             "title": "Mobitel Broadband Plans",
-            "selector": {"class_": "col-md-6 col-lg-9 inner-rightcol-main"}
+            "selector": "col-md-6 col-lg-9 inner-rightcol-main"
         }
     ]
 
-    results = []
-
-    for page in pages:
+    async def scrape_page(page):
         print(f"\n🔍 Scraping: {page['title']}")
 
         # Force re-scrape by removing old data
         if force_scrape:
-            db["scrape"].delete_one({"page": page["page_key"]})
+            await delete_scrape({"page": page["page_key"]})
             print(f"♻️ Deleted old data for {page['page_key']}")
 
         # Scrape and parse
-        soup = scrape_webpage(page["url"])
-        if not soup:
-            results.append({"error": f"❌ Failed to fetch: {page['url']}"})
-            continue
+        soup = await fetch_webpage(page["url"])
+        if soup is None:
+            return {"error": f"❌ Failed to fetch: {page['url']}"}
 
         # Get only the section you want
-        section = soup.find("div", **page["selector"])
-        if not section:
-            results.append({"error": f"❌ Selector not found: {page['selector']}"})
-            continue
+        section = find_by_class(soup, "div", page["selector"])
+        if section is None:
+            return {"error": f"❌ Selector not found: {page['selector']}"}
 
         # Optional: Extract only relevant content inside the section
-        tags = section.find_all(["h1", "h2", "h3", "table","td","tr", "p","img"])
-        section_html = "".join(str(tag) for tag in tags) if tags else section.decode_contents()
+        tags = SECTION_TAGS_XP(section)
+        section_html = "".join(outer_html(tag) for tag in tags) if tags else inner_html(section)
+
+        headings, list_items = extract_headings_and_lists(section)
 
         # Build object
         data = {
             "url": page["url"],
             "page": page["page_key"],
             "section_title": page["title"],
-            "tags": extract_headings(section),
-            "lists": extract_list_items(section),
+            "tags": headings,
+            "lists": list_items,
             "content": section_html
         }
 
         # Save to DB
-        insert_result = save_scrape(data.copy())
+        insert_result = await save_scrape(data)
         print(f"✅ Saved {page['page_key']} | Insert result: {insert_result}")
-        results.append(data)
+        return data
+
+    # The pages are independent, so fetch them concurrently
+    results = await asyncio.gather(
+        *(scrape_page(page) for page in pages),
+        return_exceptions=True
+    )
 
-    return results
+    return [
+        {"error": f"❌ Failed to scrape {page['url']}: {result}"} if isinstance(result, Exception) else result
+        for page, result in zip(pages, results)
+    ]
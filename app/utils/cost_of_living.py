@@ -1,15 +1,24 @@
-from app.common.dbConnect import db
-from app.common.html_utils import extract_headings, extract_list_items
-from app.common.scrapper import scrape_webpage
-from app.utils.db_save import save_scrape
+from lxml import etree
+from pymongo import ReturnDocument
 
+from app.common.cache import cached_scrape
+from app.common.dbConnect import get_async_db
+from app.common.html_utils import (
+    extract_headings_and_lists, find_by_class, get_text, inner_html
+)
+from app.common.scrapper import fetch_webpage
+from app.utils.db_save import save_scrape_summary
+
+CELLS_XP = etree.XPath(".//td|.//th")
+
+@cached_scrape
 async def cost_of_living(force_scrape=False):
     url = "https://www.numbeo.com/cost-of-living/country_result.jsp?country=Sri+Lanka&displayCurrency=USD"
     page_key = "livingCost"
 
     # ⚠️ Step 1: Check cache (MongoDB) first unless force_scrape
     if not force_scrape:
-        cached = db["scrape"].find_one({"page": page_key})
+        cached = await get_async_db()["scrape"].find_one({"page": page_key})
         if cached:
             cached["id"] = str(cached.pop("_id"))
             print("📦 Returning cached data")
@@ -17,32 +26,30 @@ async def cost_of_living(force_scrape=False):
 
     print("🌐 Scraping new data from:", url)
     
-    soup = scrape_webpage(url)
-    if not soup:
+    soup = await fetch_webpage(url)
+    if soup is None:
         return {"error": "Failed to fetch or parse the page."}
 
     # Step 2: Locate target table
-    content = soup.find("table", class_="data_wide_table new_bar_table")
-    if not content:
+    content = find_by_class(soup, "table", "data_wide_table new_bar_table")
+    if content is None:
         return {"error": "Could not find the expected content section."}
 
     # Step 3: Cleanup unnecessary elements
-    for tag in content.find_all(["i", "svg", "img"]):
-        tag.decompose()
+    etree.strip_elements(content, "i", "svg", "img", with_tail=False)
 
-    for a in content.find_all("a"):
-        if "edit" in a.get("class", []) or "edit" in a.get_text(strip=True).lower():
-            a.decompose()
+    for a in list(content.iterdescendants("a")):
+        if "edit" in a.get("class", "").split() or "edit" in get_text(a).lower():
+            a.drop_tree()
 
-    for row in content.find_all("tr"):
-        cells = row.find_all(["td", "th"])
+    for row in list(content.iterdescendants("tr")):
+        cells = CELLS_XP(row)
         if cells:
-            cells[-1].decompose()  # Remove last column
+            cells[-1].drop_tree()  # Remove last column
 
     # Step 4: Extract useful structured data
-    headings = extract_headings(content)
-    list_items = extract_list_items(content)
-    section_html = content.decode_contents()
+    headings, list_items = extract_headings_and_lists(content)
+    section_html = inner_html(content)
 
     data = {
         "url": url,
@@ -54,7 +61,11 @@ async def cost_of_living(force_scrape=False):
     }
 
     # Step 5: Store or replace in DB
-    db["scrape"].replace_one({"page": page_key}, data, upsert=True)
+    stored = await get_async_db()["scrape"].find_one_and_replace(
+        {"page": page_key}, data, projection={"_id": 1}, upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    await save_scrape_summary(stored["_id"], data)
     print("✅ Data scraped and saved to MongoDB.")
 
     return data
@@ -1,16 +1,106 @@
 
-from app.common.dbConnect import db
+from pymongo import ReturnDocument
 
+from app.common.dbConnect import get_async_db
 
-def save_scrape(data: any):
+
+async def save_scrape(data: any):
     if not data or "error" in data:
         print("No valid data to save.")
         return None
 
-    collection = db["scrape"]
-    result = collection.insert_one(data)
+    collection = get_async_db()["scrape"]
+    result = await collection.insert_one(data)
+    # insert_one adds the ObjectId to data; expose it as a string instead
+    data["id"] = str(data.pop("_id"))
+    await save_scrape_summary(result.inserted_id, data)
     print(f"Visa data saved to 'scrape' collection with ID: {result.inserted_id}")
     return {
         "message": "Data saved successfully",
         "id": str(result.inserted_id)
     }
+
+
+async def upsert_scrape(data: dict):
+    """Store a scraped page unless it already exists and return the stored document.
+
+    The insert-if-missing is a single atomic upsert, so concurrent cold
+    requests for the same page store it only once.
+    """
+    stored = await get_async_db()["scrape"].find_one_and_update(
+        {"page": data["page"], "section_title": data["section_title"]},
+        {"$setOnInsert": data},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    stored["id"] = str(stored.pop("_id"))
+    await save_scrape_summary(stored["id"], stored)
+    print(f"Scraped page '{stored['page']}' stored with ID: {stored['id']}")
+    return stored
+
+
+async def save_scrape_summary(scrape_id, data: dict):
+    """Upsert the scrape_summary entry listed by /api/mobile/scraped for a stored page"""
+    await get_async_db()["scrape_summary"].replace_one(
+        {"page": data["page"], "title": data["section_title"]},
+        {
+            "id": str(scrape_id),
+            "page": data["page"],
+            "title": data["section_title"],
+            "url": data.get("url"),
+            "tags_count": len(data.get("tags") or []),
+            "lists_count": len(data.get("lists") or [])
+        },
+        upsert=True
+    )
+
+
+async def delete_scrape(query: dict):
+    """Delete one stored page along with its scrape_summary entry"""
+    deleted = await get_async_db()["scrape"].find_one_and_delete(
+        query, projection={"page": 1, "section_title": 1}
+    )
+    if deleted:
+        await get_async_db()["scrape_summary"].delete_one(
+            {"page": deleted.get("page"), "title": deleted.get("section_title")}
+        )
+    return deleted
+
+
+# Shape of a scrape_summary entry, computed from a scrape document
+SCRAPE_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": {"$toString": "$_id"},
+    "page": 1,
+    "title": "$section_title",
+    "url": 1,
+    "tags_count": {"$cond": [{"$isArray": "$tags"}, {"$size": "$tags"}, 0]},
+    "lists_count": {"$cond": [{"$isArray": "$lists"}, {"$size": "$lists"}, 0]}
+}
+
+
+async def list_scrape_summaries():
+    """Return every scrape_summary entry.
+
+    Falls back to projecting the scrape collection while the summary is
+    empty, e.g. when the startup rebuild failed.
+    """
+    summaries = await get_async_db()["scrape_summary"].find({}, {"_id": 0}).to_list(None)
+    if summaries:
+        return summaries
+    return await get_async_db()["scrape"].aggregate([
+        {"$project": SCRAPE_SUMMARY_PROJECTION}
+    ]).to_list(None)
+
+
+async def rebuild_scrape_summary():
+    """Recompute every scrape_summary entry from the scrape collection"""
+    await get_async_db()["scrape"].aggregate([
+        {"$project": SCRAPE_SUMMARY_PROJECTION},
+        {"$merge": {
+            "into": "scrape_summary",
+            "on": ["page", "title"],
+            "whenMatched": "replace",
+            "whenNotMatched": "insert"
+        }}
+    ]).to_list(None)
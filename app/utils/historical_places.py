@@ -1,29 +1,29 @@
-from app.common.dbConnect import db
-from app.common.html_utils import extract_headings, extract_list_items
-from app.common.scrapper import scrape_webpage
-from app.utils.db_save import save_scrape
+from app.common.cache import cached_scrape
+from app.common.dbConnect import get_async_db
+from app.common.html_utils import extract_headings_and_lists, find_by_class, inner_html
+from app.common.scrapper import fetch_webpage
+from app.utils.db_save import upsert_scrape
 
 
+@cached_scrape
 async def historical_places_data():
     url = "https://sleepingelephantresort.com/blog/top-10-must-see-historical-sites-in-sri-lanka/"
     
-    existing = db["scrape"].find_one({"page": "historical_places"})
+    existing = await get_async_db()["scrape"].find_one({"page": "historical_places"})
     if existing:
         existing["id"] = str(existing.pop("_id"))
         return existing
     
-    soup =  scrape_webpage(url)
-    if not soup:
+    soup = await fetch_webpage(url)
+    if soup is None:
         return {"error": "Failed to fetch or parse the page."}
-    content_div = soup.find("article", class_="page pdt-60 pdb-80")
-    if not content_div:
+    content_div = find_by_class(soup, "article", "page pdt-60 pdb-80")
+    if content_div is None:
         return {"error": "Could not find content-inner section."}
     
-    headings = extract_headings(content_div)
+    headings, list_items = extract_headings_and_lists(content_div)
     
-    list_items = extract_list_items(content_div)
-    
-    section_html = content_div.decode_contents()
+    section_html = inner_html(content_div)
     
     data = {
         "url": url,
@@ -34,8 +34,6 @@ async def historical_places_data():
         "content": section_html
     }
 
-    insert_result = save_scrape(data.copy())
-
-    print("Insert result:", insert_result, type(insert_result))
+    data = await upsert_scrape(data)
 
     return data
\ No newline at end of file
@@ -1,60 +1,57 @@
 # routes/mobile_routes.py
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 from bson import ObjectId
 from datetime import datetime, timedelta
 import logging
-from pymongo import MongoClient
-import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from pymongo.errors import OperationFailure
+from app.common.dbConnect import get_db, is_missing_text_index, retry_text_index
+from app.common.json_encoding import dumps
+from app.common.offers import (
+    active_window_filter, is_offer_active, offer_page_pipeline, unpack_offer_page, utc_now
+)
+from app.common.cache import (
+    offers_cache, categories_cache, offer_details_cache, health_cache, cache_get, cache_set
+)
 
 # Create blueprint
 mobile_bp = Blueprint('mobile', __name__, url_prefix='/api/mobile')
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application (app.py)
 logger = logging.getLogger(__name__)
 
-# MongoDB connection
-try:
-    client = MongoClient(os.getenv('MONGO_URI'))
-    db = client[os.getenv('DB_NAME', 'sriLanka')]
-    
-    # Collections
-    offers_collection = db.offers
-    businesses_collection = db.businesses
-    users_collection = db.users
-    
-    logger.info(f"✅ Connected to MongoDB database: {db.name}")
-except Exception as e:
-    logger.error(f"❌ Failed to connect to MongoDB: {e}")
-    raise
+# Fields returned for each offer in list responses. Large fields such as
+# content are only returned by the offer details endpoint.
+OFFER_LIST_PROJECTION = {
+    'title': 1,
+    'description': 1,
+    'discount': 1,
+    'category': 1,
+    'businessId': 1,
+    'userId': 1,
+    'startDate': 1,
+    'endDate': 1,
+    'adminStatus': 1,
+    'isActive': 1,
+    'createdAt': 1,
+    'imageUrl': 1
+}
+
+# Fields always fetched because the status/expiry flags are computed from them
+OFFER_STATUS_FIELDS = ('adminStatus', 'isActive', 'startDate', 'endDate')
+
+# Never send account credentials along with business/user details
+ACCOUNT_PROJECTION = {'password': 0}
 
 def serialize_mongo_doc(doc):
-    """Convert MongoDB ObjectId to string for JSON serialization"""
+    """Copy a MongoDB document with _id renamed to id.
+
+    ObjectId and datetime values are left in place; the orjson JSON provider
+    encodes them in the same pass as the rest of the response.
+    """
     if doc is None:
         return None
     
-    if isinstance(doc, dict):
-        # Handle ObjectId conversion
-        if '_id' in doc:
-            doc['id'] = str(doc['_id'])
-            del doc['_id']
-        
-        # Handle businessId ObjectId
-        if 'businessId' in doc and isinstance(doc['businessId'], ObjectId):
-            doc['businessId'] = str(doc['businessId'])
-            
-        # Convert datetime objects to strings
-        for key, value in doc.items():
-            if isinstance(value, datetime):
-                doc[key] = value.isoformat()
-            elif isinstance(value, ObjectId):
-                doc[key] = str(value)
-                
-    return doc
+    return {('id' if key == '_id' else key): value for key, value in doc.items()}
 
 def get_business_details(business_id):
     """Get business details by ID"""
@@ -62,53 +59,90 @@ def get_business_details(business_id):
         if isinstance(business_id, str):
             business_id = ObjectId(business_id)
             
-        business = businesses_collection.find_one({'_id': business_id})
+        business = get_db().businesses.find_one({'_id': business_id}, ACCOUNT_PROJECTION)
         return serialize_mongo_doc(business) if business else None
     except Exception as e:
-        logger.error(f"Error fetching business {business_id}: {e}")
+        logger.error("Error fetching business %s: %s", business_id, e)
         return None
 
 def get_user_details(user_id):
     """Get user details by userId"""
     try:
         # Try to find user by userId field (number)
-        user = users_collection.find_one({'userId': int(user_id)})
+        user = get_db().users.find_one({'userId': int(user_id)}, ACCOUNT_PROJECTION)
         if not user:
             # Fallback: try string version
-            user = users_collection.find_one({'userId': str(user_id)})
+            user = get_db().users.find_one({'userId': str(user_id)}, ACCOUNT_PROJECTION)
             
         return serialize_mongo_doc(user) if user else None
     except Exception as e:
-        logger.error(f"Error fetching user {user_id}: {e}")
+        logger.error("Error fetching user %s: %s", user_id, e)
         return None
 
-def is_offer_active(offer):
-    """Check if offer is currently active based on dates and status"""
-    now = datetime.now()
-    
-    # Must be admin approved
-    if offer.get('adminStatus') != 'approved':
-        return False
-    
-    # Must be marked as active
-    if not offer.get('isActive', True):
-        return False
-    
-    # Check start date
-    start_date = offer.get('startDate')
-    if start_date and isinstance(start_date, datetime) and start_date > now:
-        return False
-    
-    # Check end date
-    end_date = offer.get('endDate')
-    if end_date and isinstance(end_date, datetime) and end_date < now:
-        return False
-    
-    return True
+def get_businesses_by_ids(business_ids):
+    """Get business details for many IDs in one query, keyed by string ID"""
+    object_ids = []
+    for business_id in business_ids:
+        try:
+            object_ids.append(business_id if isinstance(business_id, ObjectId) else ObjectId(business_id))
+        except Exception:
+            logger.error("Invalid business ID: %s", business_id)
+
+    if not object_ids:
+        return {}
+
+    try:
+        businesses = get_db().businesses.find({'_id': {'$in': object_ids}}, ACCOUNT_PROJECTION)
+        return {str(business['_id']): serialize_mongo_doc(business) for business in businesses}
+    except Exception as e:
+        logger.error("Error fetching businesses: %s", e)
+        return {}
+
+def get_users_by_ids(user_ids):
+    """Get user details for many userIds in one query, keyed by string userId"""
+    lookup_ids = set()
+    for user_id in user_ids:
+        # userId may be stored as a number or as a string
+        lookup_ids.add(str(user_id))
+        try:
+            lookup_ids.add(int(user_id))
+        except (TypeError, ValueError):
+            pass
+
+    if not lookup_ids:
+        return {}
+
+    try:
+        users = {}
+        for user in get_db().users.find({'userId': {'$in': list(lookup_ids)}}, ACCOUNT_PROJECTION):
+            key = str(user['userId'])
+            # Prefer the numeric userId match, as get_user_details does
+            if key not in users or isinstance(user['userId'], int):
+                users[key] = serialize_mongo_doc(user)
+        return users
+    except Exception as e:
+        logger.error("Error fetching users: %s", e)
+        return {}
+
+def compute_offer_statuses(offers, now):
+    """Compute status and expiry fields for a page of offers in one pass"""
+    statuses = []
+    for offer in offers:
+        status = {'isCurrentlyActive': is_offer_active(offer, now)}
+        
+        end_date = offer.get('endDate')
+        if end_date and isinstance(end_date, datetime):
+            days_until_expiry = (end_date - now).days
+            status['daysUntilExpiry'] = days_until_expiry
+            status['isExpiringSoon'] = 0 < days_until_expiry <= 7
+        
+        statuses.append(status)
+    return statuses
 
 @mobile_bp.route('/offers', methods=['GET'])
 def get_approved_offers():
     """Get all approved and active offers for mobile app"""
+    now = utc_now()
     try:
         logger.info("📱 Mobile app requesting approved offers")
         
@@ -117,6 +151,21 @@ def get_approved_offers():
         limit = int(request.args.get('limit', 20))
         category = request.args.get('category')
         search = request.args.get('search')
+        fields = request.args.get('fields')
+        
+        # Optional ?fields=title,discount,... narrows the offer projection
+        projection = OFFER_LIST_PROJECTION
+        if fields:
+            requested = {field.strip() for field in fields.split(',') if field.strip()}
+            invalid = requested - OFFER_LIST_PROJECTION.keys()
+            if invalid:
+                return jsonify({
+                    'success': False,
+                    'message': f"Unknown fields: {', '.join(sorted(invalid))}",
+                    'allowed_fields': sorted(OFFER_LIST_PROJECTION),
+                    'offers': []
+                }), 400
+            projection = {field: 1 for field in requested.union(OFFER_STATUS_FIELDS)}
         
         # Validate pagination parameters
         if page < 1:
@@ -124,70 +173,86 @@ def get_approved_offers():
         if limit > 100:  # Prevent excessive requests
             limit = 100
         
-        # Build MongoDB query - ONLY approved offers
-        query = {
-            'adminStatus': 'approved',
-            'isActive': True
-        }
-        
-        # Add category filter
-        if category:
-            query['category'] = {'$regex': category, '$options': 'i'}
-        
-        # Add search filter
-        if search:
-            query['$or'] = [
-                {'title': {'$regex': search, '$options': 'i'}},
-                {'description': {'$regex': search, '$options': 'i'}},
-                {'discount': {'$regex': search, '$options': 'i'}}
-            ]
-        
-        logger.info(f"Query filters: {query}")
-        
-        # Calculate skip value for pagination
-        skip = (page - 1) * limit
-        
-        # Get offers from database
-        cursor = offers_collection.find(query).sort('createdAt', -1).skip(skip).limit(limit)
-        offers = list(cursor)
-        
-        # Get total count for pagination
-        total_offers = offers_collection.count_documents(query)
+        # The cache holds the page of stored offers with their business and user
+        # details; status and expiry depend on the current time, so they are
+        # computed on every request
+        cache_key = f"offers:{page}:{limit}:{category}:{search}:{sorted(projection)}"
+        cached = cache_get(offers_cache, cache_key)
+        if cached is None:
+            # Build MongoDB query - ONLY approved offers
+            # Expired and not-yet-started offers are filtered out by Mongo
+            query = {
+                'adminStatus': 'approved',
+                'isActive': True,
+                '$and': active_window_filter(now)
+            }
+            
+            # Add category filter (exact values from /categories, served by the category index)
+            if category:
+                query['category'] = category
+            
+            # Add search filter (served by the offers text index)
+            if search:
+                query['$text'] = {'$search': search}
+            
+            logger.info("Query filters: %s", query)
+            
+            # Calculate skip value for pagination
+            skip = (page - 1) * limit
+            
+            # Get the page of offers and the total count in a single round-trip
+            try:
+                result = next(get_db().offers.aggregate(offer_page_pipeline(
+                    query, {'createdAt': -1}, skip, limit, page_stages=[{'$project': projection}]
+                )))
+            except OperationFailure as e:
+                if not is_missing_text_index(e):
+                    raise
+                # Startup could not build the text index; try again in the background
+                logger.error("❌ Offers text index is missing: %s", e)
+                retry_text_index(get_db())
+                return jsonify({
+                    'success': False,
+                    'message': 'Search is temporarily unavailable, please try again later',
+                    'offers': []
+                }), 503
+            offers, total_offers = unpack_offer_page(result)
+            
+            logger.info("Found %d offers out of %d total", len(offers), total_offers)
+
+            # Fetch businesses and users for the whole page in two queries
+            businesses = get_businesses_by_ids({str(o['businessId']) for o in offers if o.get('businessId')})
+            users = get_users_by_ids({str(o['userId']) for o in offers if o.get('userId')})
+
+            # Process each offer
+            page_offers = []
+            for offer in offers:
+                try:
+                    # Serialize the offer
+                    offer_data = serialize_mongo_doc(offer)
+
+                    # Attach business details
+                    if offer_data.get('businessId'):
+                        offer_data['business'] = businesses.get(str(offer_data['businessId']))
+
+                    # Attach user details
+                    if offer_data.get('userId'):
+                        offer_data['user'] = users.get(str(offer_data['userId']))
+                    
+                    page_offers.append(offer_data)
+                    
+                except Exception as e:
+                    logger.error("Error processing offer %s: %s", offer.get('_id'), e)
+                    continue
+            
+            cached = (page_offers, total_offers)
+            cache_set(offers_cache, cache_key, cached)
         
-        logger.info(f"Found {len(offers)} offers out of {total_offers} total")
+        page_offers, total_offers = cached
         
-        # Process each offer
-        processed_offers = []
-        for offer in offers:
-            try:
-                # Serialize the offer
-                offer_data = serialize_mongo_doc(offer.copy())
-                
-                # Get business details
-                if offer_data.get('businessId'):
-                    business = get_business_details(offer_data['businessId'])
-                    offer_data['business'] = business
-                
-                # Get user details
-                if offer_data.get('userId'):
-                    user = get_user_details(offer_data['userId'])
-                    offer_data['user'] = user
-                
-                # Check if offer is currently active (considering dates)
-                offer_data['isCurrentlyActive'] = is_offer_active(offer)
-                
-                # Add expiry warning
-                end_date = offer.get('endDate')
-                if end_date and isinstance(end_date, datetime):
-                    days_until_expiry = (end_date - datetime.now()).days
-                    offer_data['daysUntilExpiry'] = days_until_expiry
-                    offer_data['isExpiringSoon'] = days_until_expiry <= 7 and days_until_expiry > 0
-                
-                processed_offers.append(offer_data)
-                
-            except Exception as e:
-                logger.error(f"Error processing offer {offer.get('_id')}: {e}")
-                continue
+        # Add status and expiry information to copies of the cached offers
+        statuses = compute_offer_statuses(page_offers, now)
+        processed_offers = [dict(offer, **status) for offer, status in zip(page_offers, statuses)]
         
         # Calculate pagination info
         has_next = (page * limit) < total_offers
@@ -207,16 +272,18 @@ def get_approved_offers():
             },
             'filters': {
                 'category': category,
-                'search': search
+                'search': search,
+                'fields': fields
             },
             'message': f'Found {len(processed_offers)} approved offers'
         }
         
-        logger.info(f"✅ Returning {len(processed_offers)} offers to mobile app")
-        return jsonify(response)
+        logger.info("✅ Returning %d offers to mobile app", len(processed_offers))
+        # One body of at most 100 offers, encoded by orjson without the str round-trip of jsonify
+        return Response(dumps(response), mimetype='application/json')
         
     except Exception as e:
-        logger.error(f"❌ Error fetching approved offers: {e}")
+        logger.error("❌ Error fetching approved offers: %s", e)
         return jsonify({
             'success': False,
             'message': 'Failed to fetch approved offers',
@@ -227,59 +294,59 @@ def get_approved_offers():
 @mobile_bp.route('/offers/<offer_id>', methods=['GET'])
 def get_offer_details(offer_id):
     """Get detailed information about a specific offer"""
+    now = utc_now()
     try:
-        logger.info(f"📱 Mobile app requesting offer details for: {offer_id}")
-        
-        # Validate ObjectId format
-        try:
+        logger.info("📱 Mobile app requesting offer details for: %s", offer_id)
+        
+        # The cache holds the stored documents only; status and expiry depend
+        # on the current time, so they are computed on every request
+        offer_data = cache_get(offer_details_cache, offer_id)
+        if offer_data is None:
+            # Validate ObjectId format
+            if not ObjectId.is_valid(offer_id):
+                return jsonify({
+                    'success': False,
+                    'message': 'Invalid offer ID format'
+                }), 400
             obj_id = ObjectId(offer_id)
-        except:
-            return jsonify({
-                'success': False,
-                'message': 'Invalid offer ID format'
-            }), 400
-        
-        # Get offer from database
-        offer = offers_collection.find_one({'_id': obj_id})
-        
-        if not offer:
-            return jsonify({
-                'success': False,
-                'message': 'Offer not found'
-            }), 404
-        
-        # Check if offer is approved
-        if offer.get('adminStatus') != 'approved':
-            return jsonify({
-                'success': False,
-                'message': 'Offer is not available'
-            }), 403
-        
-        # Serialize the offer
-        offer_data = serialize_mongo_doc(offer.copy())
-        
-        # Get business details
-        if offer_data.get('businessId'):
-            business = get_business_details(offer_data['businessId'])
-            offer_data['business'] = business
-        
-        # Get user details
-        if offer_data.get('userId'):
-            user = get_user_details(offer_data['userId'])
-            offer_data['user'] = user
-        
-        # Add status information
-        offer_data['isCurrentlyActive'] = is_offer_active(offer)
+            
+            # Get offer from database
+            offer = get_db().offers.find_one({'_id': obj_id})
+            
+            if not offer:
+                return jsonify({
+                    'success': False,
+                    'message': 'Offer not found'
+                }), 404
+            
+            # Check if offer is approved
+            if offer.get('adminStatus') != 'approved':
+                return jsonify({
+                    'success': False,
+                    'message': 'Offer is not available'
+                }), 403
+            
+            # Serialize the offer
+            offer_data = serialize_mongo_doc(offer)
+            
+            # Get business details
+            if offer_data.get('businessId'):
+                business = get_business_details(offer_data['businessId'])
+                offer_data['business'] = business
+            
+            # Get user details
+            if offer_data.get('userId'):
+                user = get_user_details(offer_data['userId'])
+                offer_data['user'] = user
+            
+            cache_set(offer_details_cache, offer_id, offer_data)
         
-        # Add expiry information
-        end_date = offer.get('endDate')
-        if end_date and isinstance(end_date, datetime):
-            days_until_expiry = (end_date - datetime.now()).days
-            offer_data['daysUntilExpiry'] = days_until_expiry
-            offer_data['isExpiringSoon'] = days_until_expiry <= 7 and days_until_expiry > 0
-            offer_data['isExpired'] = days_until_expiry < 0
+        # Add status and expiry information to a copy of the cached offer
+        offer_data = dict(offer_data, **compute_offer_statuses([offer_data], now)[0])
+        if 'daysUntilExpiry' in offer_data:
+            offer_data['isExpired'] = offer_data['daysUntilExpiry'] < 0
         
-        logger.info(f"✅ Returning offer details for: {offer_data.get('title')}")
+        logger.info("✅ Returning offer details for: %s", offer_data.get('title'))
         
         return jsonify({
             'success': True,
@@ -288,7 +355,7 @@ def get_offer_details(offer_id):
         })
         
     except Exception as e:
-        logger.error(f"❌ Error fetching offer details: {e}")
+        logger.error("❌ Error fetching offer details: %s", e)
         return jsonify({
             'success': False,
             'message': 'Failed to fetch offer details',
@@ -301,28 +368,35 @@ def get_offer_categories():
     try:
         logger.info("📱 Mobile app requesting offer categories")
         
-        # Get unique categories from approved offers
-        categories = offers_collection.distinct('category', {
-            'adminStatus': 'approved',
-            'isActive': True,
-            'category': {'$ne': '', '$exists': True, '$ne': None}
-        })
+        cached = cache_get(categories_cache, 'categories')
+        if cached is not None:
+            return jsonify(cached)
         
-        # Filter out None values and sort
-        categories = [cat for cat in categories if cat is not None and cat.strip()]
-        categories.sort()
+        # Get unique, non-blank categories from approved offers, sorted by Mongo
+        categories = [doc['_id'] for doc in get_db().offers.aggregate([
+            {'$match': {
+                'adminStatus': 'approved',
+                'isActive': True,
+                'category': {'$regex': r'\S'}
+            }},
+            {'$group': {'_id': '$category'}},
+            {'$sort': {'_id': 1}}
+        ])]
         
-        logger.info(f"✅ Found {len(categories)} categories")
+        logger.info("✅ Found %d categories", len(categories))
         
-        return jsonify({
+        response = {
             'success': True,
             'categories': categories,
             'count': len(categories),
             'message': f'Found {len(categories)} categories'
-        })
+        }
+        cache_set(categories_cache, 'categories', response)
+        
+        return jsonify(response)
         
     except Exception as e:
-        logger.error(f"❌ Error fetching categories: {e}")
+        logger.error("❌ Error fetching categories: %s", e)
         return jsonify({
             'success': False,
             'message': 'Failed to fetch categories',
@@ -335,22 +409,29 @@ def health_check():
     """Health check endpoint for mobile API"""
     try:
         # Test database connection
-        offers_collection.find_one()
+        db = get_db()
+        db.client.admin.command('ping')
+        
+        # Counts are reused for 30 seconds so frequent probes only ping
+        collections = cache_get(health_cache, 'mobile_collections')
+        if collections is None:
+            collections = {
+                'offers': db.offers.estimated_document_count(),
+                'businesses': db.businesses.estimated_document_count(),
+                'users': db.users.estimated_document_count()
+            }
+            cache_set(health_cache, 'mobile_collections', collections)
         
         return jsonify({
             'success': True,
             'message': 'Mobile API is healthy',
             'timestamp': datetime.now().isoformat(),
             'database': 'connected',
-            'collections': {
-                'offers': offers_collection.count_documents({}),
-                'businesses': businesses_collection.count_documents({}),
-                'users': users_collection.count_documents({})
-            }
+            'collections': collections
         })
         
     except Exception as e:
-        logger.error(f"❌ Health check failed: {e}")
+        logger.error("❌ Health check failed: %s", e)
         return jsonify({
             'success': False,
             'message': 'Mobile API health check failed',
@@ -362,15 +443,16 @@ def health_check():
 def get_test_data():
     """Test endpoint to check database contents"""
     try:
-        # Get sample data from each collection
-        offers_sample = list(offers_collection.find().limit(2))
-        businesses_sample = list(businesses_collection.find().limit(2))
-        users_sample = list(users_collection.find().limit(2))
+        # Get sample data from each collection, without account credentials
+        db = get_db()
+        offers_sample = list(db.offers.find().limit(2))
+        businesses_sample = list(db.businesses.find({}, ACCOUNT_PROJECTION).limit(2))
+        users_sample = list(db.users.find({}, ACCOUNT_PROJECTION).limit(2))
         
         # Serialize the data
-        offers_sample = [serialize_mongo_doc(offer.copy()) for offer in offers_sample]
-        businesses_sample = [serialize_mongo_doc(business.copy()) for business in businesses_sample]
-        users_sample = [serialize_mongo_doc(user.copy()) for user in users_sample]
+        offers_sample = [serialize_mongo_doc(offer) for offer in offers_sample]
+        businesses_sample = [serialize_mongo_doc(business) for business in businesses_sample]
+        users_sample = [serialize_mongo_doc(user) for user in users_sample]
         
         return jsonify({
             'success': True,
@@ -381,14 +463,14 @@ def get_test_data():
                 'users': users_sample
             },
             'counts': {
-                'total_offers': offers_collection.count_documents({}),
-                'approved_offers': offers_collection.count_documents({'adminStatus': 'approved'}),
-                'active_offers': offers_collection.count_documents({'adminStatus': 'approved', 'isActive': True})
+                'total_offers': db.offers.count_documents({}),
+                'approved_offers': db.offers.count_documents({'adminStatus': 'approved'}),
+                'active_offers': db.offers.count_documents({'adminStatus': 'approved', 'isActive': True})
             }
         })
         
     except Exception as e:
-        logger.error(f"❌ Error fetching test data: {e}")
+        logger.error("❌ Error fetching test data: %s", e)
         return jsonify({
             'success': False,
             'message': 'Failed to fetch test data',
@@ -1,24 +1,25 @@
-from app.common.dbConnect import db
-from app.common.html_utils import extract_headings, extract_list_items
-from app.common.scrapper import scrape_webpage
+from app.common.cache import cached_scrape
+from app.common.dbConnect import get_async_db
+from app.common.html_utils import extract_headings_and_lists, find_by_class, inner_html
+from app.common.scrapper import fetch_webpage
 
-from app.utils.db_save import save_scrape
+from app.utils.db_save import upsert_scrape
 
+@cached_scrape
 async def top_places_data():
     url = 'https://traveltrails.lk/top-10-destinations-to-visit-in-sri-lanka-2024/'
-    existing = db["scrape"].find_one({"page": "top_places"})
+    existing = await get_async_db()["scrape"].find_one({"page": "top_places"})
     if existing:
         existing["id"] = str(existing.pop("_id"))  # convert ObjectId to string
         return existing
-    soup = scrape_webpage(url)
-    if not soup:
+    soup = await fetch_webpage(url)
+    if soup is None:
         return {"error": "Failed to fetch or parse the page."}
-    content_div = soup.find("div", class_="e-con-inner")
-    if not content_div:
+    content_div = find_by_class(soup, "div", "e-con-inner")
+    if content_div is None:
         return {"error": "Could not find entry-content section."}
-    headings = extract_headings(content_div)
-    list_items = extract_list_items(content_div)
-    section_html = content_div.decode_contents()
+    headings, list_items = extract_headings_and_lists(content_div)
+    section_html = inner_html(content_div)
     data = {
         "url": url,
         "page": "top_places",
@@ -27,7 +28,6 @@ async def top_places_data():
         "lists": list_items,
         "content": section_html
     }
-    insert_result = save_scrape(data.copy())
-    print("Insert result:", insert_result, type(insert_result))
+    data = await upsert_scrape(data)
 
     return data
\ No newline at end of file
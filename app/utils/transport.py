@@ -1,32 +1,37 @@
-from app.common.dbConnect import db
-from app.common.html_utils import extract_headings, extract_list_items
-from app.common.scrapper import scrape_webpage
+import re
 
-from app.utils.db_save import save_scrape
+from app.common.cache import cached_scrape
+from app.common.dbConnect import get_async_db
+from app.common.html_utils import extract_headings_and_lists, inner_html
+from app.common.scrapper import fetch_webpage
 
+from app.utils.db_save import upsert_scrape
 
+# Booking sites that moved, rewritten in a single pass over the section HTML
+URL_REWRITES = {
+    "https://www.busbooking.lk/": "https://busseat.lk/",
+    "https://sltb.express.lk/": "https://sltb.eseat.lk/",
+}
+URL_REWRITE_RE = re.compile("|".join(re.escape(url) for url in URL_REWRITES))
+
+
+@cached_scrape
 async def transport_data():
     url = "https://www.srilanka.travel/transport"
 
-    existing = db["scrape"].find_one({"page": "transport"})
+    existing = await get_async_db()["scrape"].find_one({"page": "transport"})
     if existing:
         existing["id"] = str(existing.pop("_id"))  # convert ObjectId to string
         return existing
 
-    soup = scrape_webpage(url)
-
-    content_div = soup.find("div", class_="content-inner")
-    
-    if not content_div:
-        return {"error": "Could not find content-inner section."}
+    # Only the content-inner section is parsed; the rest of the page is skipped
+    content_div = await fetch_webpage(url, only=("div", "content-inner"))
+    if content_div is None:
+        return {"error": "Failed to fetch the page or find the content-inner section."}
 
-    headings = extract_headings(content_div)
+    headings, list_items = extract_headings_and_lists(content_div)
 
-    list_items = extract_list_items(content_div)
-
-    section_html = content_div.decode_contents()
-    section_html = section_html.replace("https://www.busbooking.lk/", "https://busseat.lk/")
-    section_html = section_html.replace("https://sltb.express.lk/", "https://sltb.eseat.lk/")
+    section_html = URL_REWRITE_RE.sub(lambda m: URL_REWRITES[m.group(0)], inner_html(content_div))
 
     data = {
         "url": url,
@@ -36,11 +41,7 @@ async def transport_data():
         "lists": list_items,
         "content": section_html
     }
-    insert_result = save_scrape(data.copy())
-    print("Insert result:", insert_result, type(insert_result))
-
-    if not soup:
-        return {"error": "Failed to fetch or parse the page."}
+    data = await upsert_scrape(data)
 
     # Return the HTML content as a string
     return data
\ No newline at end of file
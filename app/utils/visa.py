@@ -1,35 +1,37 @@
-from app.common.dbConnect import db
-from app.common.scrapper import scrape_webpage
-from app.common.html_utils import extract_headings, extract_list_items
+from lxml import etree
 
-from app.utils.db_save import save_scrape # type: ignore
+from app.common.cache import cached_scrape
+from app.common.dbConnect import get_async_db
+from app.common.scrapper import fetch_webpage
+from app.common.html_utils import extract_headings_and_lists, inner_html
 
+from app.utils.db_save import upsert_scrape # type: ignore
+
+# First div.inner containing an <h4> whose text includes $title
+SECTION_XP = etree.XPath(
+    ".//div[contains(concat(' ', normalize-space(@class), ' '), ' inner ')]"
+    "[.//h4[contains(., $title)]]"
+)
+
+@cached_scrape
 async def get_visa_data(title="General Information"):
     url = "https://www.immigration.gov.lk/pages_e.php?id=14"
 
-    existing = db["scrape"].find_one({"page": "visa", "section_title": title})
+    existing = await get_async_db()["scrape"].find_one({"page": "visa", "section_title": title})
     if existing:
         existing["id"] = str(existing.pop("_id"))  # convert ObjectId to string
         return existing
     
-    soup = scrape_webpage(url)
-    if not soup:
+    soup = await fetch_webpage(url)
+    if soup is None:
         return {"error": "Failed to fetch or parse the page."}
 
-    # Extract all headings (h1-h6)
-    headings = extract_headings(soup)
-
-    # Extract all list items
-    list_items = extract_list_items(soup)
+    # Extract all headings (h1-h6) and list items
+    headings, list_items = extract_headings_and_lists(soup)
 
     # Extract specific visa content section based on title (e.g., "General Information")
-    section_html = None
-    inner_divs = soup.find_all('div', class_='inner')
-    for div in inner_divs:
-        h4 = div.find('h4', string=lambda t: t and title in t)
-        if h4:
-            section_html = div.decode_contents()
-            break
+    sections = SECTION_XP(soup, title=title)
+    section_html = inner_html(sections[0]) if sections else None
     
     
     data = {
@@ -41,7 +43,6 @@ async def get_visa_data(title="General Information"):
         "content": section_html or f"Section '{title}' not found."
     }
 
-    insert_result = save_scrape(data.copy())
-    print("Insert result:", insert_result, type(insert_result))
+    data = await upsert_scrape(data)
     return data
 
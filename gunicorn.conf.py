@@ -0,0 +1,14 @@
+# gunicorn.conf.py - production server for the Flask mobile API
+#
+#   gunicorn 'app.app:create_app()'
+#
+# The mobile routes spend most of their time waiting on MongoDB, so gevent
+# workers let each process serve many requests concurrently. gunicorn
+# monkey-patches the standard library for gevent, which makes PyMongo's
+# sockets cooperative.
+import os
+
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '5000')}"
+worker_class = 'gevent'
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+worker_connections = 1000
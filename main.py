@@ -1,18 +1,39 @@
-from fastapi import FastAPI, HTTPException, Request, Query
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
 from bson import ObjectId
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
-from pymongo import MongoClient
-import traceback
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 # Import your existing utilities
-from app.common.dbConnect import db
+from app.common.cache import (
+    api_offers_cache, cache_get, cache_set, clear_api_offers_cache, clear_scrape_cache,
+    clear_scraped_pages_cache, scraped_pages_cache
+)
+import pymongo
+from pymongo.errors import OperationFailure
+from app.common.dbConnect import (
+    ADMIN_TIMEOUT, DB_NAME, close_async_db, ensure_async_indexes, get_async_db,
+    is_missing_text_index, retry_async_text_index
+)
+from app.common.offers import (
+    OFFER_STATUS_STAGES, active_window_filter, is_offer_active, offer_page_pipeline,
+    unpack_offer_page, utc_now
+)
+from app.common.responses import ORJSONResponse, fast_response_serialization
+from app.common.scrapper import close_http_session
 from app.utils.broadband import broadband_data
 from app.utils.cost_of_living import cost_of_living
+from app.utils.db_save import list_scrape_summaries, rebuild_scrape_summary
 from app.utils.historical_places import historical_places_data
 from app.utils.search import search_keyword
 from app.utils.top_beaches import top_beaches_data
@@ -23,10 +44,87 @@ from app.utils.top_places import top_places_data
 # Load environment variables
 load_dotenv()
 
+# Handlers only enqueue log records; a listener thread, run for the app's
+# lifespan, writes them to stderr
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = QueueListener(_log_queue, _log_handler)
+
+logger = logging.getLogger("api")
+logger.setLevel(logging.INFO)
+logger.addHandler(QueueHandler(_log_queue))
+logger.propagate = False
+
+# Cached scrapers warmed at startup. broadband_data is left out because it
+# always re-scrapes and is not cached.
+WARMUP_SCRAPERS = (
+    transport_data,
+    get_visa_data,
+    top_places_data,
+    historical_places_data,
+    top_beaches_data,
+    cost_of_living
+)
+
+async def warm_scrape_caches():
+    """Load every cached scraper concurrently so first requests hit the cache"""
+    results = await asyncio.gather(
+        *(scraper() for scraper in WARMUP_SCRAPERS),
+        return_exceptions=True
+    )
+    for scraper, result in zip(WARMUP_SCRAPERS, results):
+        if isinstance(result, Exception):
+            logger.warning("⚠️ Cache warm-up failed for %s: %s", scraper.__name__, result)
+
+async def sync_scrape_summary():
+    """Bring scrape_summary in line with pages stored before it existed"""
+    try:
+        # Fail fast when MongoDB is unreachable, before the long deadline applies
+        await get_async_db().client.admin.command('ping')
+        # The $merge over every stored page can outlast the client's socket timeout
+        with pymongo.timeout(ADMIN_TIMEOUT):
+            await rebuild_scrape_summary()
+    except Exception as e:
+        logger.warning("⚠️ Could not rebuild scrape summary: %s", e)
+
+async def prepare_database():
+    """Build indexes and scrape_summary, then warm the scrape caches that read and store pages"""
+    await ensure_async_indexes(get_async_db())
+    await sync_scrape_summary()
+    await warm_scrape_caches()
+
+@asynccontextmanager
+async def lifespan(app):
+    """Start the background tasks at startup; cancel them and release resources at shutdown"""
+    _log_listener.start()
+    try:
+        # Index builds, the summary rebuild and cache warm-up run in the
+        # background so neither a long build nor a slow scrape delays startup
+        tasks = [
+            asyncio.create_task(prepare_database()),
+            asyncio.create_task(monitor_database_health())
+        ]
+        try:
+            yield
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Close the shared outbound HTTP session
+            await close_http_session()
+    finally:
+        # Motor clients are bound to this event loop; the next startup builds a new one
+        close_async_db()
+        # Flush queued log records; the next startup starts a new listener thread
+        _log_listener.stop()
+
 app = FastAPI(
     title="Sri Lanka Tours Mobile API",
     description="Mobile API for Sri Lanka Tours application",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Allow mobile frontend access
@@ -38,89 +136,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# MongoDB connection - USE THE SAME DATABASE NAME FROM .env
-mongo_client = None
-db_name = None
-offers_collection = None
-businesses_collection = None
-users_collection = None
-scrape_collection = None
-dialog_collection = None
-mobitel_collection = None
-
-try:
-    mongo_uri = os.getenv('MONGO_URI')
-    if not mongo_uri:
-        raise ValueError("MONGO_URI not found in environment variables")
-    
-    mongo_client = MongoClient(mongo_uri)
-    db_name = os.getenv('DB_NAME', 'test')
-    main_db = mongo_client[db_name]
-    
-    # Test connection
-    mongo_client.admin.command('ping')
-    
-    # Collections
-    offers_collection = main_db.offers
-    businesses_collection = main_db.businesses
-    users_collection = main_db.users
-    scrape_collection = main_db.scrape
-    dialog_collection = main_db.dialog
-    mobitel_collection = main_db.mobitel
-    
-    print(f"✅ Connected to database: {db_name}")
-    print(f"✅ Scrape collection documents: {scrape_collection.count_documents({})}")
-    
-except Exception as e:
-    print(f"❌ Failed to connect to database: {e}")
-    traceback.print_exc()
-
-def serialize_mongo_doc(doc):
-    """Convert MongoDB ObjectId to string for JSON serialization"""
-    if doc is None:
-        return None
-    
-    if isinstance(doc, dict):
-        if '_id' in doc:
-            doc['id'] = str(doc['_id'])
-            del doc['_id']
-        
-        if 'businessId' in doc and isinstance(doc['businessId'], ObjectId):
-            doc['businessId'] = str(doc['businessId'])
-            
-        for key, value in doc.items():
-            if isinstance(value, datetime):
-                doc[key] = value.isoformat()
-            elif isinstance(value, ObjectId):
-                doc[key] = str(value)
-                
-    return doc
-
-def is_offer_active(offer):
-    """Check if offer is currently active based on dates and status"""
-    now = datetime.now()
-    
-    if offer.get('adminStatus') != 'approved':
-        return False
-    
-    if not offer.get('isActive', True):
-        return False
-    
-    start_date = offer.get('startDate')
-    if start_date and isinstance(start_date, datetime) and start_date > now:
-        return False
-    
-    end_date = offer.get('endDate')
-    if end_date and isinstance(end_date, datetime) and end_date < now:
-        return False
-    
-    return True
+# Offer lists and scraped HTML are large text payloads
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# MongoDB connection - collections are reached through the pooled Motor
+# client that app.common.dbConnect builds on first use
+db_name = DB_NAME
+
+# Appended to pipelines so documents arrive with a string id instead of _id
+ID_STAGES = [
+    {'$addFields': {'id': {'$toString': '$_id'}}},
+    {'$project': {'_id': 0}}
+]
+
+# Fields the mobile list view needs; offer details still return the full document
+OFFER_LIST_PROJECTION = {
+    'title': 1,
+    'discount': 1,
+    'category': 1,
+    'imageUrl': 1,
+    'startDate': 1,
+    'endDate': 1,
+    'adminStatus': 1,
+    'isActive': 1,
+    'businessId': 1,
+    'createdAt': 1
+}
 
 # ------------------ ROOT ENDPOINT ------------------
 @app.get("/")
 async def root():
     """Root endpoint - API information"""
-    db_connected = scrape_collection is not None
+    db_connected = HEALTH_STATE['database'] == 'connected'
     
     return {
         "message": "Sri Lanka Tours Mobile API",
@@ -166,38 +213,27 @@ async def root():
 @app.get("/api/mobile/scraped")
 async def get_all_scraped_pages():
     """Get list of all available scraped pages"""
-    if scrape_collection is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
+    cached = cache_get(scraped_pages_cache, '__all__')
+    if cached is not None:
+        return Response(content=cached, media_type='application/json')
     
     try:
-        print("Fetching all scraped pages...")
+        logger.info("Fetching all scraped pages...")
         
-        # Get all scraped pages
-        scraped_pages = list(scrape_collection.find())
+        # Summaries are maintained whenever a page is stored or deleted
+        result = await list_scrape_summaries()
         
-        # Serialize and return summary
-        result = []
-        for page in scraped_pages:
-            page_data = serialize_mongo_doc(page.copy())
-            result.append({
-                'id': page_data.get('id'),
-                'page': page_data.get('page'),
-                'title': page_data.get('section_title'),
-                'url': page_data.get('url'),
-                'tags_count': len(page_data.get('tags', [])),
-                'lists_count': len(page_data.get('lists', []))
-            })
-        
-        return {
+        response = ORJSONResponse({
             'success': True,
             'pages': result,
             'total': len(result),
             'message': f'Found {len(result)} scraped pages'
-        }
+        })
+        cache_set(scraped_pages_cache, '__all__', response.body)
+        return response
         
     except Exception as e:
-        print(f"Error fetching scraped data: {e}")
-        traceback.print_exc()
+        logger.exception("Error fetching scraped data: %s", e)
         raise HTTPException(
             status_code=500,
             detail={
@@ -210,14 +246,20 @@ async def get_all_scraped_pages():
 @app.get("/api/mobile/scraped/{page_name}")
 async def get_scraped_page(page_name: str):
     """Get specific scraped page data by page name"""
-    if scrape_collection is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
+    cached = cache_get(scraped_pages_cache, page_name)
+    if cached is not None:
+        return Response(content=cached, media_type='application/json')
     
     try:
-        print(f"Mobile app requesting scraped page: {page_name}")
+        logger.info("Mobile app requesting scraped page: %s", page_name)
         
         # Find the page in database
-        page_data = scrape_collection.find_one({'page': page_name})
+        pages = await get_async_db().scrape.aggregate([
+            {'$match': {'page': page_name}},
+            {'$limit': 1},
+            *ID_STAGES
+        ]).to_list(1)
+        page_data = pages[0] if pages else None
         
         if not page_data:
             raise HTTPException(
@@ -229,20 +271,18 @@ async def get_scraped_page(page_name: str):
                 }
             )
         
-        # Serialize and return
-        result = serialize_mongo_doc(page_data.copy())
-        
-        return {
+        response = ORJSONResponse({
             'success': True,
-            'data': result,
+            'data': page_data,
             'message': f'Successfully retrieved {page_name} data'
-        }
+        })
+        cache_set(scraped_pages_cache, page_name, response.body)
+        return response
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error fetching scraped page: {e}")
-        traceback.print_exc()
+        logger.exception("Error fetching scraped page: %s", e)
         raise HTTPException(
             status_code=500,
             detail={
@@ -256,7 +296,7 @@ async def get_scraped_page(page_name: str):
 async def refresh_scraped_data(page_name: str):
     """Force re-scrape a specific page"""
     try:
-        print(f"Force refreshing scraped data for: {page_name}")
+        logger.info("Force refreshing scraped data for: %s", page_name)
         
         # Map page names to scraping functions
         scrape_functions = {
@@ -279,8 +319,11 @@ async def refresh_scraped_data(page_name: str):
                 }
             )
         
-        # Execute scraping function
+        # Execute scraping function, bypassing the in-memory scrape cache
+        clear_scrape_cache()
         result = await scrape_functions[page_name]()
+        # Responses cached while the scrape was running may be stale
+        clear_scraped_pages_cache()
         
         return {
             'success': True,
@@ -291,8 +334,7 @@ async def refresh_scraped_data(page_name: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error refreshing scraped data: {e}")
-        traceback.print_exc()
+        logger.exception("Error refreshing scraped data: %s", e)
         raise HTTPException(
             status_code=500,
             detail={
@@ -302,6 +344,18 @@ async def refresh_scraped_data(page_name: str):
             }
         )
 
+# ------------------ CACHE ENDPOINTS ------------------
+
+@app.post("/api/admin/cache/invalidate")
+async def invalidate_cache():
+    """Drop this worker's in-memory cached responses"""
+    clear_scrape_cache()
+    clear_api_offers_cache()
+    return {
+        'success': True,
+        'message': 'Caches cleared for this worker'
+    }
+
 # ------------------ MOBILE OFFERS ENDPOINTS ------------------
 
 @app.get("/api/mobile/offers")
@@ -312,54 +366,53 @@ async def get_approved_offers(
     search: Optional[str] = None
 ):
     """Get all approved and active offers for mobile app"""
-    if offers_collection is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
+    cache_key = (page, limit, category or '', search or '')
+    cached = cache_get(api_offers_cache, cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type='application/json')
     
     try:
-        print("Mobile app requesting approved offers")
+        logger.info("Mobile app requesting approved offers")
         
         query = {
             'adminStatus': 'approved',
-            'isActive': True
+            'isActive': True,
+            '$and': active_window_filter()
         }
         
+        # Exact category values (as listed by the app) use the compound index
         if category:
-            query['category'] = {'$regex': category, '$options': 'i'}
+            query['category'] = category
         
+        # Search goes through the offers_text index, best matches first
+        sort = {'createdAt': -1}
         if search:
-            query['$or'] = [
-                {'title': {'$regex': search, '$options': 'i'}},
-                {'discount': {'$regex': search, '$options': 'i'}},
-                {'category': {'$regex': search, '$options': 'i'}}
-            ]
+            query['$text'] = {'$search': search}
+            sort = {'score': -1, 'createdAt': -1}
         
         skip = (page - 1) * limit
-        cursor = offers_collection.find(query).sort('createdAt', -1).skip(skip).limit(limit)
-        offers = list(cursor)
-        total_offers = offers_collection.count_documents(query)
-        
-        processed_offers = []
-        for offer in offers:
-            try:
-                offer_data = serialize_mongo_doc(offer.copy())
-                offer_data['isCurrentlyActive'] = is_offer_active(offer)
-                
-                end_date = offer.get('endDate')
-                if end_date and isinstance(end_date, datetime):
-                    days_until_expiry = (end_date - datetime.now()).days
-                    offer_data['daysUntilExpiry'] = days_until_expiry
-                    offer_data['isExpiringSoon'] = days_until_expiry <= 7 and days_until_expiry > 0
-                
-                processed_offers.append(offer_data)
-            except Exception as e:
-                print(f"Error processing offer {offer.get('_id')}: {e}")
-                continue
+        # Page and total count in one round-trip
+        pipeline = offer_page_pipeline(
+            query, sort, skip, limit,
+            page_stages=[{'$project': OFFER_LIST_PROJECTION}, *OFFER_STATUS_STAGES, *ID_STAGES],
+            text_score=bool(search)
+        )
+        try:
+            result = await get_async_db().offers.aggregate(pipeline).next()
+        except OperationFailure as e:
+            if not is_missing_text_index(e):
+                raise
+            # Startup could not build the text index; try again in the background
+            logger.error("Offers text index is missing: %s", e)
+            retry_async_text_index(get_async_db())
+            raise HTTPException(status_code=503, detail="Search is temporarily unavailable, please try again later")
+        processed_offers, total_offers = unpack_offer_page(result)
         
         has_next = (page * limit) < total_offers
         has_prev = page > 1
         total_pages = (total_offers + limit - 1) // limit
         
-        return {
+        response = ORJSONResponse({
             'success': True,
             'offers': processed_offers,
             'pagination': {
@@ -375,26 +428,30 @@ async def get_approved_offers(
                 'search': search
             },
             'message': f'Found {len(processed_offers)} approved offers'
-        }
+        })
+        cache_set(api_offers_cache, cache_key, response.body)
+        return response
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error fetching approved offers: {e}")
-        traceback.print_exc()
+        logger.exception("Error fetching approved offers: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/mobile/offers/{offer_id}")
 async def get_offer_details(offer_id: str):
     """Get detailed information about a specific offer"""
-    if offers_collection is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
-    
     try:
-        try:
-            obj_id = ObjectId(offer_id)
-        except:
+        if not ObjectId.is_valid(offer_id):
             raise HTTPException(status_code=400, detail="Invalid offer ID format")
+        obj_id = ObjectId(offer_id)
         
-        offer = offers_collection.find_one({'_id': obj_id})
+        offers = await get_async_db().offers.aggregate([
+            {'$match': {'_id': obj_id}},
+            {'$limit': 1},
+            *ID_STAGES
+        ]).to_list(1)
+        offer = offers[0] if offers else None
         
         if not offer:
             raise HTTPException(status_code=404, detail="Offer not found")
@@ -402,103 +459,112 @@ async def get_offer_details(offer_id: str):
         if offer.get('adminStatus') != 'approved':
             raise HTTPException(status_code=403, detail="Offer is not available")
         
-        offer_data = serialize_mongo_doc(offer.copy())
-        offer_data['isCurrentlyActive'] = is_offer_active(offer)
+        # Same UTC clock as the list filter, so list and details agree at the window edges
+        now = utc_now()
+        offer['isCurrentlyActive'] = is_offer_active(offer, now)
         
         end_date = offer.get('endDate')
         if end_date and isinstance(end_date, datetime):
-            days_until_expiry = (end_date - datetime.now()).days
-            offer_data['daysUntilExpiry'] = days_until_expiry
-            offer_data['isExpiringSoon'] = days_until_expiry <= 7 and days_until_expiry > 0
-            offer_data['isExpired'] = days_until_expiry < 0
+            days_until_expiry = (end_date - now).days
+            offer['daysUntilExpiry'] = days_until_expiry
+            offer['isExpiringSoon'] = days_until_expiry <= 7 and days_until_expiry > 0
+            offer['isExpired'] = days_until_expiry < 0
         
-        return {
+        return ORJSONResponse({
             'success': True,
-            'offer': offer_data,
+            'offer': offer,
             'message': 'Offer details retrieved successfully'
-        }
+        })
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error fetching offer details: {e}")
-        traceback.print_exc()
+        logger.exception("Error fetching offer details: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # ------------------ HEALTH & TEST ENDPOINTS ------------------
 
-@app.get("/api/mobile/health")
-async def mobile_health_check():
-    """Health check endpoint for mobile API"""
-    db_status = "disconnected"
-    collections_info = {}
-    
+# Database state refreshed by a background task, so health probes never touch Mongo
+HEALTH_PING_INTERVAL = 10
+HEALTH_COUNTS_INTERVAL = 30
+HEALTH_STATE = {
+    'database': 'unknown',
+    'checkedAt': None,
+    'collections': {}
+}
+
+async def count_collections():
+    """Estimated document counts (from collection metadata) for every collection"""
+    db = get_async_db()
+    collections = ('offers', 'businesses', 'users', 'scrape', 'dialog', 'mobitel')
+    counts = await asyncio.gather(*(
+        db[name].estimated_document_count()
+        for name in collections
+    ))
+    return dict(zip(collections, counts))
+
+async def check_database_health(recount=True):
+    """Ping Mongo (and optionally recount collections) into HEALTH_STATE"""
     try:
-        # Check if collections are initialized
-        if scrape_collection is None:
-            db_status = "not_initialized"
-        else:
-            try:
-                # Test the connection
-                mongo_client.admin.command('ping')
-                db_status = "connected"
-                
-                # Count documents safely
-                collections_info = {
-                    'offers': offers_collection.count_documents({}) if offers_collection is not None else 0,
-                    'businesses': businesses_collection.count_documents({}) if businesses_collection is not None else 0,
-                    'users': users_collection.count_documents({}) if users_collection is not None else 0,
-                    'scrape': scrape_collection.count_documents({}) if scrape_collection is not None else 0,
-                    'dialog': dialog_collection.count_documents({}) if dialog_collection is not None else 0,
-                    'mobitel': mobitel_collection.count_documents({}) if mobitel_collection is not None else 0
-                }
-            except Exception as conn_error:
-                print(f"Connection test failed: {conn_error}")
-                traceback.print_exc()
-                db_status = "connection_failed"
-        
-        return {
-            'success': True,
-            'message': 'Mobile API is healthy',
-            'timestamp': datetime.now().isoformat(),
-            'database': db_status,
-            'collections': collections_info,
-            'mongodb_uri_configured': bool(os.getenv('MONGO_URI')),
-            'db_name': db_name if db_name else 'not_set'
-        }
-        
+        await get_async_db().client.admin.command('ping')
+        HEALTH_STATE['database'] = 'connected'
+        if recount:
+            HEALTH_STATE['collections'] = await count_collections()
     except Exception as e:
-        print(f"Health check error: {e}")
-        traceback.print_exc()
-        return {
-            'success': False,
-            'message': 'Health check encountered an error',
-            'error': str(e),
-            'database': db_status
-        }
+        logger.warning("Connection test failed: %s", e)
+        HEALTH_STATE['database'] = 'connection_failed'
+    HEALTH_STATE['checkedAt'] = datetime.now(timezone.utc).isoformat()
+
+async def monitor_database_health():
+    """Ping Mongo every HEALTH_PING_INTERVAL seconds and recount every HEALTH_COUNTS_INTERVAL"""
+    counted_at = None
+    while True:
+        recount = counted_at is None or time.monotonic() - counted_at >= HEALTH_COUNTS_INTERVAL
+        await check_database_health(recount)
+        if recount and HEALTH_STATE['database'] == 'connected':
+            counted_at = time.monotonic()
+        await asyncio.sleep(HEALTH_PING_INTERVAL)
+
+@app.get("/api/mobile/health")
+async def mobile_health_check(full: bool = False):
+    """Health check endpoint for mobile API; full=true adds collection counts"""
+    # Check inline until the background monitor has completed its first run
+    if HEALTH_STATE['checkedAt'] is None:
+        await check_database_health()
+    return {
+        'success': True,
+        'message': 'Mobile API is healthy',
+        'timestamp': datetime.now().isoformat(),
+        'database': HEALTH_STATE['database'],
+        'checkedAt': HEALTH_STATE['checkedAt'],
+        'collections': HEALTH_STATE['collections'] if full else {},
+        'mongodb_uri_configured': bool(os.getenv('MONGO_URI')),
+        'db_name': db_name if db_name else 'not_set'
+    }
 
 @app.get("/api/mobile/test-data")
 async def get_test_data():
     """Test endpoint to check database contents"""
-    if scrape_collection is None:
-        return {
-            'success': False,
-            'message': 'Database not connected',
-            'error': 'MongoDB connection failed'
-        }
-    
     try:
-        offers_sample = list(offers_collection.find().limit(2)) if offers_collection is not None else []
-        businesses_sample = list(businesses_collection.find().limit(2)) if businesses_collection is not None else []
-        users_sample = list(users_collection.find().limit(2)) if users_collection is not None else []
-        scrape_sample = list(scrape_collection.find().limit(5)) if scrape_collection is not None else []
-        
-        offers_sample = [serialize_mongo_doc(o.copy()) for o in offers_sample]
-        businesses_sample = [serialize_mongo_doc(b.copy()) for b in businesses_sample]
-        users_sample = [serialize_mongo_doc(u.copy()) for u in users_sample]
-        scrape_sample = [serialize_mongo_doc(s.copy()) for s in scrape_sample]
+        # Samples leave out passwords and the scraped HTML blobs. Totals come
+        # from collection metadata, the status counts from the offers index,
+        # and every query runs concurrently.
+        db = get_async_db()
+        (
+            offers_sample, businesses_sample, users_sample, scrape_sample,
+            total_offers, approved_offers, active_offers, scraped_pages
+        ) = await asyncio.gather(
+            db.offers.aggregate([{'$limit': 2}, *ID_STAGES]).to_list(2),
+            db.businesses.aggregate([{'$limit': 2}, {'$project': {'password': 0}}, *ID_STAGES]).to_list(2),
+            db.users.aggregate([{'$limit': 2}, {'$project': {'password': 0}}, *ID_STAGES]).to_list(2),
+            db.scrape.aggregate([{'$limit': 5}, {'$project': {'content': 0}}, *ID_STAGES]).to_list(5),
+            db.offers.estimated_document_count(),
+            db.offers.count_documents({'adminStatus': 'approved'}),
+            db.offers.count_documents({'adminStatus': 'approved', 'isActive': True}),
+            db.scrape.estimated_document_count()
+        )
         
-        return {
+        return ORJSONResponse({
             'success': True,
             'message': 'Test data retrieved',
             'data': {
@@ -508,25 +574,21 @@ async def get_test_data():
                 'scraped_pages': scrape_sample
             },
             'counts': {
-                'total_offers': offers_collection.count_documents({}) if offers_collection is not None else 0,
-                'approved_offers': offers_collection.count_documents({'adminStatus': 'approved'}) if offers_collection is not None else 0,
-                'active_offers': offers_collection.count_documents({'adminStatus': 'approved', 'isActive': True}) if offers_collection is not None else 0,
-                'scraped_pages': scrape_collection.count_documents({}) if scrape_collection is not None else 0
+                'total_offers': total_offers,
+                'approved_offers': approved_offers,
+                'active_offers': active_offers,
+                'scraped_pages': scraped_pages
             },
             'database_info': {
                 'db_name': db_name,
                 'collections_available': {
-                    'offers': offers_collection is not None,
-                    'businesses': businesses_collection is not None,
-                    'users': users_collection is not None,
-                    'scrape': scrape_collection is not None
+                    name: True for name in ('offers', 'businesses', 'users', 'scrape')
                 }
             }
-        }
+        })
         
     except Exception as e:
-        print(f"Error in test-data: {e}")
-        traceback.print_exc()
+        logger.exception("Error in test-data: %s", e)
         return {
             'success': False,
             'message': 'Failed to fetch test data',
@@ -540,73 +602,57 @@ class Detail(BaseModel):
     days: str
     price: int
 
-@app.post("/api/packages/dialog")
-async def save_dialog_packages(details: List[Detail]):
-    if dialog_collection is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
-    dialog_collection.insert_many([detail.dict() for detail in details])
-    return {"message": "Dialog packages saved successfully"}
-
-@app.get("/api/packages/dialog")
-async def get_dialog_packages():
-    if dialog_collection is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
-    packages = list(dialog_collection.find())
-    for pkg in packages:
-        pkg["id"] = str(pkg.pop("_id"))
-    return packages
-
-@app.put("/api/packages/dialog/{id}")
-async def update_dialog_package(id: str, detail: Detail):
-    if dialog_collection is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
-    result = dialog_collection.update_one({"_id": ObjectId(id)}, {"$set": detail.dict()})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Package not found")
-    return {"message": "Dialog package updated successfully"}
-
-@app.delete("/api/packages/dialog/{id}")
-async def delete_dialog_package(id: str):
-    if dialog_collection is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
-    result = dialog_collection.delete_one({"_id": ObjectId(id)})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Package not found")
-    return {"message": "Dialog package deleted successfully"}
-
-@app.post("/api/packages/mobitel")
-async def save_mobitel_packages(details: List[Detail]):
-    if mobitel_collection is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
-    mobitel_collection.insert_many([detail.dict() for detail in details])
-    return {"message": "Mobitel packages saved successfully"}
-
-@app.get("/api/packages/mobitel")
-async def get_mobitel_packages():
-    if mobitel_collection is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
-    packages = list(mobitel_collection.find())
-    for pkg in packages:
-        pkg["id"] = str(pkg.pop("_id"))
-    return packages
-
-@app.put("/api/packages/mobitel/{id}")
-async def update_mobitel_package(id: str, detail: Detail):
-    if mobitel_collection is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
-    result = mobitel_collection.update_one({"_id": ObjectId(id)}, {"$set": detail.dict()})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Package not found")
-    return {"message": "Mobitel package updated successfully"}
-
-@app.delete("/api/packages/mobitel/{id}")
-async def delete_mobitel_package(id: str):
-    if mobitel_collection is None:
-        raise HTTPException(status_code=503, detail="Database not connected")
-    result = mobitel_collection.delete_one({"_id": ObjectId(id)})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Package not found")
-    return {"message": "Mobitel package deleted successfully"}
+# Packages are shaped on the server and returned in one large batch
+PACKAGE_PIPELINE = [
+    {'$project': {
+        '_id': 0,
+        'id': {'$toString': '$_id'},
+        'description': 1,
+        'days': 1,
+        'price': 1
+    }}
+]
+PACKAGE_BATCH_SIZE = 2000
+
+def make_package_router(prefix: str, collection_name: str, name: str) -> APIRouter:
+    """CRUD routes for one provider's package collection, mounted under prefix"""
+    router = APIRouter(prefix=prefix)
+
+    @router.post("")
+    async def save_packages(details: List[Detail]):
+        collection = get_async_db()[collection_name]
+        await collection.insert_many([detail.model_dump() for detail in details], ordered=False)
+        return {"message": f"{name} packages saved successfully"}
+
+    @router.get("")
+    async def get_packages():
+        collection = get_async_db()[collection_name]
+        return await collection.aggregate(PACKAGE_PIPELINE, batchSize=PACKAGE_BATCH_SIZE).to_list(None)
+
+    @router.put("/{id}")
+    async def update_package(id: str, detail: Detail):
+        collection = get_async_db()[collection_name]
+        if not ObjectId.is_valid(id):
+            raise HTTPException(status_code=400, detail="Invalid package ID format")
+        result = await collection.update_one({"_id": ObjectId(id)}, {"$set": detail.model_dump()})
+        if result.matched_count == 0:
+            raise HTTPException(status_code=404, detail="Package not found")
+        return {"message": f"{name} package updated successfully"}
+
+    @router.delete("/{id}")
+    async def delete_package(id: str):
+        collection = get_async_db()[collection_name]
+        if not ObjectId.is_valid(id):
+            raise HTTPException(status_code=400, detail="Invalid package ID format")
+        result = await collection.delete_one({"_id": ObjectId(id)})
+        if result.deleted_count == 0:
+            raise HTTPException(status_code=404, detail="Package not found")
+        return {"message": f"{name} package deleted successfully"}
+
+    return router
+
+app.include_router(make_package_router("/api/packages/dialog", "dialog", "Dialog"))
+app.include_router(make_package_router("/api/packages/mobitel", "mobitel", "Mobitel"))
 
 # ------------------ ORIGINAL SCRAPING ENDPOINTS ------------------
 
@@ -662,4 +708,7 @@ async def broadband():
     result = await broadband_data()
     if not result:
         return {"message": "No results found"}
-    return result
\ No newline at end of file
+    return result
+
+# Must run after every route above is declared
+fast_response_serialization(app)
@@ -0,0 +1,110 @@
+import os
+from datetime import timedelta
+
+import pytest
+from bson import ObjectId
+
+pytest.importorskip("flask")
+pytest.importorskip("motor")
+# dbConnect requires a URI at import time; no connection is made
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+
+from app import app as flask_app  # noqa: E402
+from app.common.cache import offers_cache  # noqa: E402
+from app.common.offers import utc_now  # noqa: E402
+from app.utils import mobile_routes  # noqa: E402
+
+
+class FakeCollection:
+    def __init__(self, docs=(), page=None):
+        self.docs = list(docs)
+        self.page = page
+
+    def aggregate(self, pipeline):
+        return iter([self.page])
+
+    def find(self, query, projection=None):
+        return iter(self.docs)
+
+
+class FakeDb:
+    def __init__(self, offers=(), total=None, businesses=(), users=()):
+        offers = list(offers)
+        total = len(offers) if total is None else total
+        self.offers = FakeCollection(page={"data": offers, "total": [{"n": total}] if total else []})
+        self.businesses = FakeCollection(businesses)
+        self.users = FakeCollection(users)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Flask test client; call client.use_db(FakeDb(...)) to choose what the routes read"""
+    def use_db(db):
+        monkeypatch.setattr(mobile_routes, "get_db", lambda: db)
+
+    monkeypatch.setattr(flask_app, "get_db", lambda: None)
+    monkeypatch.setattr(flask_app, "ensure_indexes", lambda db: None)
+    offers_cache.clear()
+    test_client = flask_app.create_app().test_client()
+    test_client.use_db = use_db
+    yield test_client
+    offers_cache.clear()
+
+
+def test_offers_empty_page(client):
+    client.use_db(FakeDb())
+
+    response = client.get("/api/mobile/offers")
+
+    assert response.status_code == 200
+    assert response.headers["Content-Length"] == str(len(response.data))
+    body = response.get_json()
+    assert body["success"] is True
+    assert body["offers"] == []
+    assert body["pagination"] == {
+        "currentPage": 1,
+        "totalPages": 0,
+        "totalOffers": 0,
+        "hasNext": False,
+        "hasPrev": False,
+        "limit": 20,
+    }
+    assert body["message"] == "Found 0 approved offers"
+
+
+def test_offers_page_attaches_business(client):
+    offer_id, business_id = ObjectId(), ObjectId()
+    client.use_db(FakeDb(
+        offers=[{
+            "_id": offer_id,
+            "title": "Half price",
+            "businessId": business_id,
+            "adminStatus": "approved",
+            "isActive": True,
+            "endDate": utc_now() + timedelta(days=3, hours=1),
+        }],
+        businesses=[{"_id": business_id, "name": "Beach Cafe"}],
+    ))
+
+    response = client.get("/api/mobile/offers")
+
+    assert response.status_code == 200
+    offer = response.get_json()["offers"][0]
+    assert offer["id"] == str(offer_id)
+    assert offer["businessId"] == str(business_id)
+    assert offer["business"] == {"id": str(business_id), "name": "Beach Cafe"}
+    assert offer["isCurrentlyActive"] is True
+    assert offer["daysUntilExpiry"] == 3
+    assert offer["isExpiringSoon"] is True
+
+
+def test_offers_rejects_unknown_fields(client):
+    client.use_db(FakeDb())
+
+    response = client.get("/api/mobile/offers?fields=title,password")
+
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body["success"] is False
+    assert body["message"] == "Unknown fields: password"
+    assert body["allowed_fields"] == sorted(mobile_routes.OFFER_LIST_PROJECTION)
@@ -0,0 +1,52 @@
+import os
+import uuid
+from datetime import timedelta
+
+import orjson
+import pytest
+
+from app.common.offers import OFFER_STATUS_STAGES, utc_now
+
+pymongo = pytest.importorskip("pymongo")
+
+
+@pytest.fixture
+def offers():
+    """Offers collection in a throwaway database on TEST_MONGO_URI.
+
+    Deliberately not MONGO_URI: the tests write to and drop what they use,
+    so they only run against a server set aside for testing.
+    """
+    uri = os.getenv("TEST_MONGO_URI")
+    if not uri:
+        pytest.skip("TEST_MONGO_URI is not set")
+    client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except pymongo.errors.PyMongoError as e:
+        pytest.skip(f"Test MongoDB is not reachable: {e}")
+    db_name = f"offer_status_tests_{uuid.uuid4().hex}"
+    yield client[db_name]["offers"]
+    client.drop_database(db_name)
+    client.close()
+
+
+def test_days_until_expiry_is_an_integer(offers):
+    offers.insert_one({"_id": 1, "endDate": utc_now() + timedelta(days=2, hours=12)})
+
+    offer = offers.aggregate([*OFFER_STATUS_STAGES]).next()
+
+    assert isinstance(offer["daysUntilExpiry"], int)
+    assert offer["daysUntilExpiry"] == 2
+    assert orjson.dumps(offer["daysUntilExpiry"]) == b"2"
+    assert offer["isExpiringSoon"] is True
+    assert offer["isCurrentlyActive"] is True
+
+
+def test_expiry_fields_need_a_date(offers):
+    offers.insert_one({"_id": 1, "endDate": "soon"})
+
+    offer = offers.aggregate([*OFFER_STATUS_STAGES]).next()
+
+    assert "daysUntilExpiry" not in offer
+    assert "isExpiringSoon" not in offer
@@ -0,0 +1,29 @@
+from app.common.scrapper import parse_html, parse_section
+
+PAGE = b"""<html><head><meta charset="utf-8"><title>Visa</title></head>
+<body><div class="content"><p>Caf\xc3\xa9</p></div></body></html>"""
+
+
+def test_parse_html_falls_back_on_unknown_charset():
+    tree = parse_html(PAGE, "not-a-charset")
+    assert tree is not None
+    assert tree.findtext(".//p") == "Café"
+
+
+def test_parse_section_falls_back_on_unknown_charset():
+    section = parse_section(PAGE, "div", "content", encoding="not-a-charset")
+    assert section is not None
+    assert section.findtext("p") == "Café"
+
+
+def test_parse_section_returns_outermost_match():
+    page = b"""<html><body>
+    <div class="entry outer"><h2>Outer</h2>
+        <div class="entry inner"><h2>Inner</h2></div>
+    </div>
+    <div class="entry"><h2>Later</h2></div>
+    </body></html>"""
+    section = parse_section(page, "div", "entry")
+    assert section is not None
+    assert "outer" in section.get("class").split()
+    assert section.findtext("h2") == "Outer"